@@ -1,3 +1,5 @@
+import sys
+
 from PyQt5.QtCore import QSizeF, QPointF
 
 
@@ -40,6 +42,6 @@ class Keymap:
             normalized_size=tuple(data["normalized_size"]),
             keycombo=data["keycombo"],
             normalized_position=tuple(data["normalized_position"]),
-            type=data["type"],
+            type=sys.intern(data["type"]),  # Every keymap of a type shares one string
             hold=data.get("hold", False)
         )
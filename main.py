@@ -3,18 +3,17 @@ import os  # For checking file existence
 import subprocess
 import sys
 import threading
+import time
 
-import win32con
 import win32gui
-from PyQt5.QtCore import pyqtSignal, Qt, QPoint, QTimer
-from PyQt5.QtGui import QKeySequence, QPainter, QColor, QKeyEvent, QFont, QIcon
+from PyQt5.QtCore import pyqtSignal, Qt, QPoint, QRectF, QTimer
+from PyQt5.QtGui import QKeySequence, QPainter, QPainterPath, QBrush, QColor, QKeyEvent, QFont, QIcon
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, \
     QMainWindow, QStackedWidget, QApplication
 
 from keymap import Keymap
 from main_content_area_widget import MainContentAreaWidget
 from overlay_widget import OverlayWidget
-from settings_dialog import SettingsDialog
 from sidebar_widget import SidebarWidget
 
 # Helper class for non-blocking subprocess output reading
@@ -36,9 +35,13 @@ SCRCPY_WINDOW_TITLE_BASE = "Lindo_Scrcpy_Instance"
 # Aspect ratio of the Scrcpy display
 # From '--new-display=1920x1080'
 SCRCPY_ASPECT_RATIO = 16.0 / 9.0
+SCRCPY_ASPECT_RATIO_INV = 9.0 / 16.0  # Height per unit of width, so the geometry code multiplies instead of divides
 SCRCPY_NATIVE_WIDTH = 1280  # Native resolution for ADB tap commands
 SCRCPY_NATIVE_HEIGHT = 720  # Native resolution for ADB tap commands
 
+# Fill of the rounded main window background drawn in paintEvent
+WINDOW_BACKGROUND_BRUSH = QBrush(QColor(40, 42, 54))
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -67,6 +70,18 @@ class MyQtApp(QMainWindow):
         self.setStyleSheet(self.load_stylesheet_from_file(resource_path('style.css')))
         self.setMouseTracking(True)
         self.edit_mode_active = False
+        self._settings_dialog = None  # Created on first use, then reused
+        # (page, edit mode, container position and size) the overlay was last placed for
+        self._last_overlay_state = None
+        self._overlay_needs_raise = True  # Set when the overlay's z-order may have changed
+        self._overlay_update_pending = False  # An overlay placement is queued for the next event loop iteration
+        self._background_path = None  # Rounded window background, rebuilt when the window size changes
+        self._background_path_size = None
+        # Window resizes are handled once they pause, instead of on every intermediate size
+        self._resize_debounce = QTimer(self)
+        self._resize_debounce.setSingleShot(True)
+        self._resize_debounce.setInterval(40)
+        self._resize_debounce.timeout.connect(self._do_resize_work)
 
         self.main_widget = QWidget()
         self.setCentralWidget(self.main_widget)
@@ -83,7 +98,7 @@ class MyQtApp(QMainWindow):
 
         self.load_settings_from_local_json()
         self.num_instances = len(self.settings.get("instances", []))
-        device_serials = [None] * self.num_instances
+        self.device_serials = [None] * self.num_instances
 
         self.sidebar = SidebarWidget(num_instances=self.num_instances, parent=self)
         self.sidebar.edit_requested.connect(self.toggle_edit_mode)
@@ -93,25 +108,22 @@ class MyQtApp(QMainWindow):
         self.stacked_widget = QStackedWidget(self)
         self.content_layout.addWidget(self.stacked_widget, 1)
 
-        self.main_content_pages = []
-        for i in range(self.num_instances):
-            serial = device_serials[i] if i < len(device_serials) else None
-            page = MainContentAreaWidget(instance_id=i, title_base=SCRCPY_WINDOW_TITLE_BASE,
-                                         settings=self.settings.get("instances")[i],
-                                         device_serial=serial, parent=self)
-            page.scrcpy_container_ready.connect(self.on_scrcpy_container_ready)
-            self.stacked_widget.addWidget(page)
-            self.main_content_pages.append(page)
+        # Pages (and their scrcpy processes) are created the first time an instance is shown,
+        # until then its slot in the stacked widget holds an empty placeholder.
+        self.main_content_pages = [None] * self.num_instances
+        for _ in range(self.num_instances):
+            self.stacked_widget.addWidget(QWidget())
 
-        self.sidebar.instance_selected.connect(self.stacked_widget.setCurrentIndex)
+        self.sidebar.instance_selected.connect(self.show_instance)
         self.stacked_widget.currentChanged.connect(self._on_stacked_widget_page_changed)
 
         if self.num_instances > 0:
-            self.stacked_widget.setCurrentIndex(0)
+            self.show_instance(0)
 
         self.update_max_restore_button()
 
         self.current_instance_keymaps = []
+        self._keymap_by_key = {}  # First key of a keymap's combination -> keymap, for key press lookups
         self.play_overlay = OverlayWidget(keymaps=self.current_instance_keymaps, is_transparent_to_mouse=True,
                                           general_settings=self.settings.get("general_settings", {}),
                                           parent=self)
@@ -119,7 +131,16 @@ class MyQtApp(QMainWindow):
                                           is_transparent_to_mouse=False,
                                           general_settings=self.settings.get("general_settings", {}),
                                           parent=self)
-        self.edit_overlay.keymaps_changed.connect(self.save_keymaps_to_local_json)
+        # Edits are saved once they pause, instead of rewriting the file on every change
+        self._keymaps_dirty = False
+        self._keymap_save_timer = QTimer(self)
+        self._keymap_save_timer.setSingleShot(True)
+        self._keymap_save_timer.setInterval(300)
+        self._keymap_save_timer.timeout.connect(self._flush_keymaps_to_disk)
+        self.edit_overlay.keymaps_changed.connect(self._schedule_keymap_save)
+        # Both overlays share the keymaps list, refresh the play overlay's cached geometry on edits
+        self.edit_overlay.keymaps_changed.connect(self.play_overlay.set_keymaps)
+        self.edit_overlay.keymaps_changed.connect(self._rebuild_keymap_index)
 
         self.play_overlay.show()
         self.edit_overlay.hide()
@@ -131,6 +152,35 @@ class MyQtApp(QMainWindow):
         self.keyboard_status_updated.connect(self._update_keyboard_status)
         self._start_logcat_monitoring()
 
+    def _ensure_page(self, index: int) -> MainContentAreaWidget:
+        """
+        Returns the page of the given instance, creating it in place of its placeholder on first use.
+        Returns None for an unopened instance whose settings were removed, it only goes away after a restart.
+        """
+        page = self.main_content_pages[index]
+        if page is None:
+            instances = self.settings.get("instances", [])
+            if index >= len(instances):
+                print(f"Instance {index + 1} was removed in the settings, restart the application to apply it.")
+                return None
+            serial = self.device_serials[index] if index < len(self.device_serials) else None
+            page = MainContentAreaWidget(instance_id=index, title_base=SCRCPY_WINDOW_TITLE_BASE,
+                                         settings=instances[index],
+                                         device_serial=serial, parent=self)
+            page.scrcpy_container_ready.connect(self.on_scrcpy_container_ready)
+            placeholder = self.stacked_widget.widget(index)
+            self.main_content_pages[index] = page
+            self.stacked_widget.insertWidget(index, page)
+            self.stacked_widget.removeWidget(placeholder)
+            placeholder.deleteLater()
+        return page
+
+    def show_instance(self, index: int):
+        """Switches the stacked widget to the given instance, creating its page if needed."""
+        if self._ensure_page(index) is None:
+            return
+        self.stacked_widget.setCurrentIndex(index)
+
     def _get_adb_base_command(self):
         """Get the base ADB command with device selection"""
         current_page = self.stacked_widget.currentWidget()
@@ -245,7 +295,6 @@ class MyQtApp(QMainWindow):
         try:
             self.adb_shell_process.stdin.write(command + '\n')
             self.adb_shell_process.stdin.flush()
-            print(f"Sent command: {command}")
             return True
         except Exception as e:
             print(f"Error sending command via shell: {e}")
@@ -257,10 +306,7 @@ class MyQtApp(QMainWindow):
         """Send keyevent using persistent shell"""
         current_page = self.stacked_widget.currentWidget()
         if current_page and current_page.scrcpy_display_id is not None:
-            command = f"input keyevent {keycode}"
-            if self._send_shell_command(command):
-                device_ip = "192.168.1.38" if current_page.settings.get('use_tcpip') else "usb"
-                print(f"Sent ADB keyevent '{keycode}' to {device_ip} via persistent shell")
+            self._send_shell_command(f"input keyevent {keycode}")
         else:
             print(f"Cannot send ADB keyevent '{keycode}': No active Scrcpy page or display ID not detected.")
 
@@ -269,11 +315,7 @@ class MyQtApp(QMainWindow):
         current_page = self.stacked_widget.currentWidget()
         if current_page and current_page.scrcpy_display_id is not None:
             display_id = current_page.scrcpy_display_id
-            command = f"input -d {display_id} swipe {x1} {y1} {x2} {y2} {duration}"
-            if self._send_shell_command(command):
-                device_ip = "192.168.1.38" if current_page.settings.get('use_tcpip') else "usb"
-                print(
-                    f"Sent ADB swipe to {device_ip} (display {display_id}) from ({x1}, {y1}) to ({x2}, {y2}) with duration {duration}ms via persistent shell")
+            self._send_shell_command(f"input -d {display_id} swipe {x1} {y1} {x2} {y2} {duration}")
         else:
             print("Cannot send ADB swipe: No active Scrcpy page or display ID not detected.")
 
@@ -282,19 +324,31 @@ class MyQtApp(QMainWindow):
         current_page = self.stacked_widget.currentWidget()
         if current_page and current_page.scrcpy_display_id is not None:
             display_id = current_page.scrcpy_display_id
-            command = f"input -d {display_id} tap {x} {y}"
-            if self._send_shell_command(command):
-                device_ip = "192.168.1.38" if current_page.settings.get('use_tcpip') else "usb"
-                print(
-                    f"Sent ADB tap to {device_ip} (display {display_id}) at coordinates ({x}, {y}) via persistent shell")
+            self._send_shell_command(f"input -d {display_id} tap {x} {y}")
         else:
             print("Cannot send ADB tap: No active Scrcpy page or display ID not detected.")
 
+    def _schedule_keymap_save(self, keymaps_list: list):
+        """Marks the keymaps as changed and (re)starts the save timer, so a burst of edits is written once."""
+        self._keymaps_dirty = True
+        self._keymap_save_timer.start()
+
+    def _flush_keymaps_to_disk(self):
+        """Writes the keymaps now if they changed since the last save."""
+        self._keymap_save_timer.stop()
+        if self._keymaps_dirty:
+            self._keymaps_dirty = False
+            self.save_keymaps_to_local_json(self.current_instance_keymaps)
+
     def save_keymaps_to_local_json(self, keymaps_list: list):
         serializable_keymaps = [km.to_dict() for km in keymaps_list]
         try:
-            with open(KEYMAP_FILE, 'w') as f:
-                json.dump(serializable_keymaps, f, indent=4)
+            # Write to a temporary file first so an interrupted save never leaves a truncated keymap file
+            temp_file = KEYMAP_FILE + ".tmp"
+            with open(temp_file, 'w') as f:
+                # Encoding is the same as json.dump, only the buffered write() calls become one
+                f.write(json.dumps(serializable_keymaps, indent=4))
+            os.replace(temp_file, KEYMAP_FILE)
             print(f"Keymaps saved to {KEYMAP_FILE} successfully.")
         except Exception as e:
             print(f"Error saving keymaps to local JSON: {e}")
@@ -332,11 +386,28 @@ class MyQtApp(QMainWindow):
             self.save_keymaps_to_local_json(loaded_keymaps)
 
         self.current_instance_keymaps[:] = loaded_keymaps
+        self._rebuild_keymap_index()
         self.play_overlay.set_keymaps(self.current_instance_keymaps)
         self.edit_overlay.set_keymaps(self.current_instance_keymaps)
 
+    def _rebuild_keymap_index(self, *args):
+        """Maps each key to the first keymap whose combination starts with it, so a key press is one dict lookup."""
+        keymap_by_key = {}
+        for keymap in self.current_instance_keymaps:
+            if keymap.keycombo:
+                keymap_by_key.setdefault(keymap.keycombo[0], keymap)
+        self._keymap_by_key = keymap_by_key
+
     def toggle_edit_mode(self):
-        self.edit_mode_active = not self.edit_mode_active
+        self.set_edit_mode(not self.edit_mode_active)
+
+    def set_edit_mode(self, active: bool):
+        """Enters or leaves edit mode. Does nothing when already in the requested mode."""
+        if active == self.edit_mode_active:
+            return
+        self.edit_mode_active = active
+        self._last_overlay_state = None  # The other overlay has to be placed
+        self._overlay_needs_raise = True
         print(f"Edit mode toggled to: {self.edit_mode_active}")
 
         if self.edit_mode_active:
@@ -363,17 +434,49 @@ class MyQtApp(QMainWindow):
 
     def show_settings_dialog(self):
         print("Opening settings dialog...")
+        # Only populating the dialog from self.settings can fail (e.g. a value of the wrong type in settings.json)
         try:
-            dialog = SettingsDialog(current_settings=self.settings, parent=self)
-            if dialog.exec_():
-                print("Settings dialog saved")
-                self.settings = dialog.get_settings()
-                self.edit_overlay.reload_settings(self.settings.get("general_settings", {}))
-                self.play_overlay.reload_settings(self.settings.get("general_settings", {}))
+            # Build the dialog once and re-populate it on later opens instead of rebuilding its widgets
+            if self._settings_dialog is None:
+                # Imported on first open so the settings module isn't loaded before the main window shows
+                from settings_dialog import SettingsDialog
+                self._settings_dialog = SettingsDialog(current_settings=self.settings, parent=self)
             else:
-                print("Settings dialog cancelled")
-        except Exception as e:
+                self._settings_dialog.reset_with(self.settings)
+        except (TypeError, ValueError, AttributeError) as e:
             print(f"Error showing settings dialog: {e}")
+            if self._settings_dialog is not None:
+                self._settings_dialog.deleteLater()  # Don't reuse a half-populated dialog
+                self._settings_dialog = None
+            return
+
+        if self._settings_dialog.exec_():
+            print("Settings dialog saved")
+            self._apply_settings(self._settings_dialog.get_settings())
+        else:
+            print("Settings dialog cancelled")
+
+    def _apply_settings(self, new_settings: dict):
+        """Applies settings saved from the settings dialog, only updating the parts that changed."""
+        if new_settings == self.settings:
+            print("Settings unchanged, nothing to apply.")
+            return
+
+        old_settings = self.settings
+        self.settings = new_settings
+
+        general_settings = new_settings.get("general_settings", {})
+        if general_settings != old_settings.get("general_settings", {}):
+            self.edit_overlay.reload_settings(general_settings)
+            self.play_overlay.reload_settings(general_settings)
+
+        new_instances = new_settings.get("instances", [])
+        for page, old_instance, new_instance in zip(self.main_content_pages, old_settings.get("instances", []),
+                                                    new_instances):
+            if page and new_instance != old_instance:
+                page.settings = new_instance  # Used the next time this instance's Scrcpy is started
+        if len(new_instances) != self.num_instances:
+            print("Number of instances changed, restart the application to apply it.")
 
     @property
     def gripSize(self):
@@ -389,8 +492,11 @@ class MyQtApp(QMainWindow):
 
     def resizeEvent(self, event):
         QMainWindow.resizeEvent(self, event)
+        self._resize_debounce.start()  # Restarted by every resize, fires 40 ms after the last one
+
+    def _do_resize_work(self):
         self.update_max_restore_button()
-        QTimer.singleShot(0, self.update_global_overlay_geometry)
+        self.update_global_overlay_geometry()
 
     def mouseDoubleClickEvent(self, event):
         super().mouseDoubleClickEvent(event)
@@ -402,11 +508,11 @@ class MyQtApp(QMainWindow):
             self.showMaximized()
 
         self.update_max_restore_button()
-        self.update_global_overlay_geometry()
+        self._schedule_overlay_update()
 
     def moveEvent(self, event):
         super().moveEvent(event)
-        self.update_global_overlay_geometry()
+        self._schedule_overlay_update()
 
     def _update_keyboard_status(self, is_active: bool):
         if self.is_soft_keyboard_active == is_active:
@@ -428,18 +534,24 @@ class MyQtApp(QMainWindow):
             print("Focus set to main application for keymap input.")
 
     def paintEvent(self, event):
+        if self._background_path_size != self.size():
+            self._background_path = QPainterPath()
+            self._background_path.addRoundedRect(QRectF(self.rect()), 10, 10)
+            self._background_path_size = self.size()
+
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.TextAntialiasing)
-        painter.setBrush(QColor(40, 42, 54))
+        painter.setBrush(WINDOW_BACKGROUND_BRUSH)
         painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(self.rect(), 10, 10)
+        painter.drawPath(self._background_path)
 
     def update_max_restore_button(self):
         pass
 
     def showEvent(self, event):
         super().showEvent(event)
+        self._last_overlay_state = None  # Re-place and re-raise the overlay after the window comes back
+        self._overlay_needs_raise = True
         self.update_max_restore_button()
         self.update_global_overlay_geometry()
 
@@ -452,38 +564,43 @@ class MyQtApp(QMainWindow):
                 print(f"Warning: Could not set native focus to Scrcpy window on showEvent: {e}")
 
     def _on_stacked_widget_page_changed(self, index: int):
-        print(f"Stacked widget page changed to index: {index}")
-        for i, page in enumerate(self.main_content_pages):
-            if page.scrcpy_hwnd:
-                if i == index:
-                    win32gui.ShowWindow(page.scrcpy_hwnd, win32con.SW_SHOW)
-                    # No need for this resize here, it will happen after layout update
-                    # page.resize_scrcpy_native_window()
-                    try:
-                        # win32gui.SetFocus(page.scrcpy_hwnd)
-                        # And again, no need for this resize here
-                        # page.resize_scrcpy_native_window()
-                        print(f"Set native focus to Scrcpy window HWND: {page.scrcpy_hwnd} on page change.")
-                    except Exception as e:
-                        print(f"Warning: Could not set native focus to Scrcpy window on page change: {e}")
-                else:
-                    win32gui.ShowWindow(page.scrcpy_hwnd, win32con.SW_HIDE)
-
+        self._last_overlay_state = None
+        self._overlay_needs_raise = True
+        # The stacked widget hides the old page and shows the new one, and the pages' hideEvent/showEvent
+        # already show or hide their own scrcpy window, so there is no need to touch every instance's window here.
         # Force a layout recalculation for the main window's central widget
         # This is the most crucial part to fix the sidebar
         self.main_widget.updateGeometry()
         self.main_layout.invalidate()
         self.content_layout.invalidate()  # Invalidate the specific layout containing sidebar and stacked widget
 
-        # Give a small delay for Scrcpy window to potentially update its size/position
-        # then update the overlay geometry. A short delay can be beneficial here.
-        QTimer.singleShot(100, self.update_global_overlay_geometry)
+        # Update the overlay geometry once the event loop has processed the layout requests queued above
+        # and the new page's show/resize events, no need for a wall-clock delay.
+        self._schedule_overlay_update()
 
     def on_scrcpy_container_ready(self):
         print("Received scrcpy_container_ready signal. Updating overlay geometry.")
-        QTimer.singleShot(0, self.update_global_overlay_geometry)
+        self._schedule_overlay_update()
+
+    def _schedule_overlay_update(self):
+        """Queues one update_global_overlay_geometry for the next event loop iteration, however often it's asked for."""
+        if self._overlay_update_pending:
+            return
+        self._overlay_update_pending = True
+        QTimer.singleShot(0, self._flush_overlay_update)
+
+    def _flush_overlay_update(self):
+        self._overlay_update_pending = False
+        self.update_global_overlay_geometry()
 
     def update_global_overlay_geometry(self):
+        if not self.edit_mode_active and not self.current_instance_keymaps:
+            # The play overlay would draw nothing, no need to map and place it
+            if self.play_overlay.isVisible():
+                self.play_overlay.hide()
+            self._last_overlay_state = None
+            return
+
         try:
             current_page = self.stacked_widget.currentWidget()
             if current_page and hasattr(current_page,
@@ -493,23 +610,35 @@ class MyQtApp(QMainWindow):
                 global_pos = current_page.scrcpy_container_widget.mapToGlobal(QPoint(0, 0))
                 available_width, available_height = current_page.scrcpy_container_widget.width(), current_page.scrcpy_container_widget.height()
 
-                target_height_by_width = int(available_width / SCRCPY_ASPECT_RATIO)
-                if target_height_by_width <= available_height:
-                    active_display_width, active_display_height = available_width, target_height_by_width
+                state = (id(current_page), self.edit_mode_active, global_pos.x(), global_pos.y(),
+                         available_width, available_height)
+                if state == self._last_overlay_state:
+                    return  # The overlay is already placed for this container
+
+                # Narrower than the display's aspect ratio: fit the width, otherwise fit the height
+                if available_width <= available_height * SCRCPY_ASPECT_RATIO:
+                    active_display_width = available_width
+                    active_display_height = int(available_width * SCRCPY_ASPECT_RATIO_INV)
                 else:
-                    active_display_width, active_display_height = int(
-                        available_height * SCRCPY_ASPECT_RATIO), available_height
+                    active_display_width = int(available_height * SCRCPY_ASPECT_RATIO)
+                    active_display_height = available_height
 
                 offset_x, offset_y = (available_width - active_display_width) // 2, (
                         available_height - active_display_height) // 2
 
                 overlay_x, overlay_y = global_pos.x() + offset_x, global_pos.y() + offset_y
                 active_overlay_to_move.setGeometry(overlay_x, overlay_y, active_display_width, active_display_height)
-                active_overlay_to_move.raise_()
 
                 if active_overlay_to_move.isHidden():
                     active_overlay_to_move.show()
+                    self._overlay_needs_raise = True
+                # Moving or resizing doesn't change the z-order, only restack when something else may have
+                if self._overlay_needs_raise:
+                    active_overlay_to_move.raise_()
+                    self._overlay_needs_raise = False
+                self._last_overlay_state = state
             else:
+                self._last_overlay_state = None
                 self.play_overlay.hide()
                 self.edit_overlay.hide()
         except Exception as e:
@@ -522,8 +651,7 @@ class MyQtApp(QMainWindow):
 
         if not self.edit_mode_active:
             if event.key() == Qt.Key_Alt:
-                self.stacked_widget.setCurrentIndex(
-                    (self.stacked_widget.currentIndex() + 1) % self.stacked_widget.count())
+                self.show_instance((self.stacked_widget.currentIndex() + 1) % self.stacked_widget.count())
                 event.accept()
                 return
 
@@ -541,26 +669,22 @@ class MyQtApp(QMainWindow):
                 event.accept()
                 return
 
-            keymap_activated = False
-            for keymap in self.current_instance_keymaps:
-                if len(keymap.keycombo) > 0 and event.key() == keymap.keycombo[0]:
-                    pixel_x_native = keymap.normalized_position.x() * SCRCPY_NATIVE_WIDTH
-                    pixel_y_native = keymap.normalized_position.y() * SCRCPY_NATIVE_HEIGHT
-                    pixel_width_native = keymap.normalized_size.width() * SCRCPY_NATIVE_WIDTH
-                    pixel_height_native = keymap.normalized_size.height() * SCRCPY_NATIVE_HEIGHT
-                    center_x_native = int(pixel_x_native + pixel_width_native / 2)
-                    center_y_native = int(pixel_y_native + pixel_height_native / 2)
-                    if keymap.hold:
-                        duration = self.settings.get("general_settings", {}).get("hold_time", 100)
-                        self.send_scrcpy_swipe(center_x_native, center_y_native, center_x_native, center_y_native,
-                                               duration)
-                    else:
-                        self.send_scrcpy_tap(center_x_native, center_y_native)
-                    event.accept()
-                    keymap_activated = True
-                    break
-
-            if not keymap_activated:
+            keymap = self._keymap_by_key.get(event.key())
+            if keymap is not None:
+                pixel_x_native = keymap.normalized_position.x() * SCRCPY_NATIVE_WIDTH
+                pixel_y_native = keymap.normalized_position.y() * SCRCPY_NATIVE_HEIGHT
+                pixel_width_native = keymap.normalized_size.width() * SCRCPY_NATIVE_WIDTH
+                pixel_height_native = keymap.normalized_size.height() * SCRCPY_NATIVE_HEIGHT
+                center_x_native = int(pixel_x_native + pixel_width_native / 2)
+                center_y_native = int(pixel_y_native + pixel_height_native / 2)
+                if keymap.hold:
+                    duration = self.settings.get("general_settings", {}).get("hold_time", 100)
+                    self.send_scrcpy_swipe(center_x_native, center_y_native, center_x_native, center_y_native,
+                                           duration)
+                else:
+                    self.send_scrcpy_tap(center_x_native, center_y_native)
+                event.accept()
+            else:
                 super().keyPressEvent(event)
         else:
             self.edit_overlay.keyPressEvent(event)
@@ -578,13 +702,21 @@ class MyQtApp(QMainWindow):
             except Exception as e:
                 print(f"Error closing ADB shell: {e}")
 
+        self._flush_keymaps_to_disk()
+
         self.play_overlay.hide()
         self.edit_overlay.hide()
         self.play_overlay.deleteLater()
         self.edit_overlay.deleteLater()
 
-        for page in self.main_content_pages:
-            page.stop_scrcpy()
+        # Signal every Scrcpy process first so they all shut down at once, then wait for them against one
+        # shared 2 s deadline, so the total wait is the slowest process rather than the sum of all of them
+        started_pages = [page for page in self.main_content_pages if page]
+        for page in started_pages:
+            page.request_stop()
+        deadline = time.monotonic() + 2.0
+        for page in started_pages:
+            page.await_stopped(max(0.0, deadline - time.monotonic()))
 
         super().closeEvent(event)
 
@@ -1,14 +1,112 @@
+import ctypes
 import win32con
 import re
 import subprocess
+import time
+from ctypes import wintypes
 
 import win32gui
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QEvent
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal
 from PyQt5.QtGui import QWindow
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
 
 from non_blocking_stream_reader import NonBlockingStreamReader
 
+# Optional scrcpy arguments that carry a value, as (settings key, argument template)
+_SCRCPY_VALUE_ARGS = (
+    ('video_codec', '--video-codec={}'),
+    ('max_fps', '--max-fps={}'),
+)
+# Optional scrcpy flags that don't take a value, appended when the setting is truthy
+_SCRCPY_FLAG_ARGS = (
+    ('turn_screen_off', '-S'),
+    ('no_audio', '--no-audio'),
+    ('no_decorations', '--no-vd-system-decorations'),
+)
+
+# scrcpy prints the id of the virtual display it created as "... (id=N)"
+_DISPLAY_ID_RE = re.compile(r'\(id=(\d+)\)')
+# Line prefixes of scrcpy's own INFO logs, from the client and from the server on the device
+_SCRCPY_INFO_PREFIXES = ('INFO:', '[server] INFO:')
+
+# The scrcpy window is normally picked up by a WinEvent hook the moment it is shown. Polling is only a fallback:
+# how often to look for the window after starting scrcpy, and for how many attempts before polling stops
+SCRCPY_EMBED_POLL_INTERVAL_MS = 500
+SCRCPY_EMBED_MAX_ATTEMPTS = 30
+
+EVENT_OBJECT_SHOW = 0x8002
+OBJID_WINDOW = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+
+_WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG,
+                                   wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+_user32 = ctypes.windll.user32
+_user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, _WinEventProc,
+                                    wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+_user32.SetWinEventHook.restype = wintypes.HANDLE
+_user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_user32.UnhookWinEvent.restype = wintypes.BOOL
+
+
+class _WindowIndex:
+    """
+    Title -> HWND snapshot of the top-level windows, shared by every instance waiting for its scrcpy window.
+    The snapshot stays fresh for half a poll interval: long enough that N instances polling on the same tick share
+    one EnumWindows, short enough that a timer firing a little early still gets a new snapshot on its next tick.
+    """
+    _snapshot = {}
+    _snapshot_time = 0.0
+
+    @classmethod
+    def find(cls, title: str):
+        if time.monotonic() - cls._snapshot_time >= SCRCPY_EMBED_POLL_INTERVAL_MS / 2000:
+            cls.rebuild()
+        return cls._snapshot.get(title)
+
+    @classmethod
+    def rebuild(cls):
+        snapshot = {}
+
+        def enum_windows_callback(hwnd, extra):
+            title = win32gui.GetWindowText(hwnd)
+            if title:
+                snapshot.setdefault(title, hwnd)  # Keep the topmost window, like the first-match search did
+            return True
+
+        win32gui.EnumWindows(enum_windows_callback, None)
+        cls._snapshot = snapshot
+        cls._snapshot_time = time.monotonic()
+
+
+def _build_scrcpy_command(settings: dict, window_title: str) -> list:
+    """
+    Builds the scrcpy command line for the given instance settings.
+    Args:
+        settings (dict): The instance settings.
+        window_title (str): The window title scrcpy should use, so the window can be found later.
+    Returns:
+        list: The command and its arguments.
+    """
+    if settings.get('use_tcpip') and settings.get('tcpip_address'):
+        cmd = ['scrcpy', f"--tcpip={settings['tcpip_address']}"]
+    else:
+        cmd = ['scrcpy', '-d']
+
+    cmd.extend(template.format(settings[key]) for key, template in _SCRCPY_VALUE_ARGS if settings.get(key))
+
+    # Prepare the display string, including resolution and optional density.
+    display_str = settings.get('resolution', '1920x1080')
+    if settings.get('density'):
+        display_str += f"/{settings['density']}"
+    cmd.append(f"--new-display={display_str}")
+    cmd.append(f"--window-title={window_title}")
+
+    if settings.get('start_app'):
+        cmd.append(f"--start-app={settings['start_app']}")
+
+    cmd.extend(flag for key, flag in _SCRCPY_FLAG_ARGS if settings.get(key))
+    return cmd
+
 
 class MainContentAreaWidget(QWidget):
     scrcpy_container_ready = pyqtSignal()
@@ -23,13 +121,24 @@ class MainContentAreaWidget(QWidget):
         self.instance_id = instance_id
         self.device_serial = device_serial
         self.scrcpy_process = None
+        self._stopping_scrcpy_process = None  # Terminated by request_stop, not yet reaped by await_stopped
         self.scrcpy_hwnd = None
         self.scrcpy_qwindow = None
         self.scrcpy_container_widget = None
-        self.scrcpy_stdout_reader = None
-        self.scrcpy_stderr_reader = None
+        self.scrcpy_stdout_reader = None  # Reads scrcpy's stdout, which stderr is redirected into
         self.scrcpy_output_timer = QTimer(self)
+        self.scrcpy_embed_timer = QTimer(self)
+        self.scrcpy_embed_timer.setInterval(SCRCPY_EMBED_POLL_INTERVAL_MS)
+        self._embed_attempts = 0
+        self._win_event_hook = None  # Reports the scrcpy process' windows being shown while we wait for ours
+        self._win_event_proc = None  # Keeps the ctypes callback alive as long as the hook exists
+        # The native window is resized once the widget's resizes pause
+        self._resize_debounce = QTimer(self)
+        self._resize_debounce.setSingleShot(True)
+        self._resize_debounce.setInterval(40)
+        self._resize_debounce.timeout.connect(self.resize_scrcpy_native_window)
         self.scrcpy_display_id = None
+        self._last_embedded_size = (0, 0)  # Last (width, height) passed to MoveWindow for the embedded window
         self.scrcpy_expected_title = f"{title_base}_{self.instance_id}"
 
         self.main_content_layout = QVBoxLayout(self)
@@ -46,27 +155,31 @@ class MainContentAreaWidget(QWidget):
         self.main_content_layout.addWidget(self.placeholder_label)
 
         self.scrcpy_output_timer.timeout.connect(self._read_scrcpy_output)
+        self.scrcpy_embed_timer.timeout.connect(self.find_and_embed_scrcpy)
         if self.start:
-            QTimer.singleShot(2000 * instance_id, self.start_scrcpy)
-        self.installEventFilter(self)
+            QTimer.singleShot(0, self.start_scrcpy)
 
     def _read_scrcpy_output(self):
         if not self.scrcpy_process:
             self.scrcpy_output_timer.stop()
             return
 
-        stdout_line = self.scrcpy_stdout_reader.readline()
-        if stdout_line:
-            line_str = stdout_line.strip()
-            match = re.search(r'\(id=(\d+)\)', line_str)
-            if match:
-                self.scrcpy_display_id = int(match.group(1))
-                print(f"Detected Scrcpy Display ID: {self.scrcpy_display_id} for instance {self.instance_id + 1}")
-                self.scrcpy_output_timer.stop()
-
-        stderr_line = self.scrcpy_stderr_reader.readline()
-        if stderr_line:
-            print(f"Scrcpy STDERR ({self.instance_id + 1}): {stderr_line.strip()}")
+        # stderr is merged into stdout: scrcpy logs INFO (including the display id) to stdout, everything else
+        # (its warnings and errors, and adb's messages it passes through) is echoed. Drain every line that arrived
+        # since the last tick.
+        while True:
+            line = self.scrcpy_stdout_reader.readline()
+            if line is None:
+                return
+            if not line.startswith(_SCRCPY_INFO_PREFIXES):
+                print(f"Scrcpy ({self.instance_id + 1}): {line.strip()}")
+            elif '(id=' in line:  # Cheap substring check before running the regex
+                match = _DISPLAY_ID_RE.search(line)
+                if match:
+                    self.scrcpy_display_id = int(match.group(1))
+                    print(f"Detected Scrcpy Display ID: {self.scrcpy_display_id} for instance {self.instance_id + 1}")
+                    self.scrcpy_output_timer.stop()
+                    return
 
     def start_scrcpy(self):
         if self.scrcpy_process and self.scrcpy_process.poll() is None:
@@ -75,55 +188,20 @@ class MainContentAreaWidget(QWidget):
 
         print(f"Starting Scrcpy for Instance {self.instance_id + 1}...")
         try:
-            cmd = ['scrcpy']
-
-            # Check if TCPIP is enabled and an address is provided, then extend the command.
-            if self.settings.get('use_tcpip') and self.settings.get('tcpip_address'):
-                cmd.extend([f"--tcpip={self.settings.get('tcpip_address')}"])
-            else:
-                cmd.extend(["-d"])
-
-            # Check if a video codec is specified, then extend the command.
-            if self.settings.get('video_codec'):
-                cmd.extend([f"--video-codec={self.settings.get('video_codec')}"])
-
-            # Check if a maximum FPS is specified, then extend the command (converted to string).
-            if self.settings.get('max_fps'):
-                cmd.extend([f"--max-fps={str(self.settings.get('max_fps'))}"])
-
-            # Prepare the display string, including resolution and optional density.
-            display_str = self.settings.get('resolution', '1920x1080')
-            if self.settings.get('density'):
-                display_str += f"/{self.settings.get('density')}"
-            cmd.extend([f"--new-display={display_str}"])
-
-            # Add the window title to the command.
-            cmd.extend([f"--window-title={self.scrcpy_expected_title}"])
-
-            # If 'start_app' setting is present, add it to the command in the desired format: '--start-app=value'.
-            if self.settings.get('start_app'):
-                cmd.extend([f"--start-app={self.settings.get('start_app')}"])
-
-            # Check if screen turn-off is enabled, then append the '-S' flag (this flag doesn't take a value).
-            if self.settings.get('turn_screen_off'):
-                cmd.append('-S')
-            if self.settings.get('no_audio'):
-                cmd.append('--no-audio')
-
-            # Check if no decorations are desired, then append the corresponding flag (this flag doesn't take a value).
-            if self.settings.get('no_decorations'):
-                cmd.append('--no-vd-system-decorations')
-
-            print(f"Executing: {str.join(' ', cmd)}")
-            self.scrcpy_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cmd = _build_scrcpy_command(self.settings, self.scrcpy_expected_title)
+
+            print(f"Executing: {' '.join(cmd)}")
+            self.scrcpy_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
                                                    creationflags=subprocess.CREATE_NO_WINDOW, universal_newlines=True)
             print(f"Scrcpy process for instance {self.instance_id + 1} started with PID: {self.scrcpy_process.pid}")
 
             self.scrcpy_stdout_reader = NonBlockingStreamReader(self.scrcpy_process.stdout)
-            self.scrcpy_stderr_reader = NonBlockingStreamReader(self.scrcpy_process.stderr)
             self.scrcpy_output_timer.start(100)
 
-            QTimer.singleShot(2000, self.find_and_embed_scrcpy)
+            # Embed the window as soon as scrcpy shows it, with a slow poll as a fallback
+            self._install_window_hook(self.scrcpy_process.pid)
+            self._embed_attempts = 0
+            self.scrcpy_embed_timer.start()
         except FileNotFoundError:
             print(f"Error: Scrcpy not found. Make sure 'scrcpy.exe' is in your system PATH or provide its full path.")
             self.placeholder_label.setText("Error: Scrcpy not found!")
@@ -131,65 +209,124 @@ class MainContentAreaWidget(QWidget):
             print(f"Error starting Scrcpy for instance {self.instance_id + 1}: {e}")
             self.placeholder_label.setText(f"Error: {e}")
 
+    def _install_window_hook(self, process_id: int):
+        """Asks Windows to report the windows shown by the scrcpy process, so its window is embedded without delay."""
+        self._remove_window_hook()
+        self._win_event_proc = _WinEventProc(self._on_win_event)
+        self._win_event_hook = _user32.SetWinEventHook(EVENT_OBJECT_SHOW, EVENT_OBJECT_SHOW, 0, self._win_event_proc,
+                                                       process_id, 0, WINEVENT_OUTOFCONTEXT)
+        if not self._win_event_hook:
+            print(f"Warning: Could not hook window events for instance {self.instance_id + 1}, polling instead.")
+            self._win_event_proc = None
+
+    def _remove_window_hook(self):
+        if self._win_event_hook:
+            _user32.UnhookWinEvent(self._win_event_hook)
+        self._win_event_hook = None
+        self._win_event_proc = None
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        # Out of context hooks are delivered through this thread's message loop, i.e. on the Qt thread.
+        # Embedding (and unhooking) is still left to the event loop, outside of the hook callback.
+        if id_object == OBJID_WINDOW and hwnd and not self.scrcpy_hwnd \
+                and win32gui.GetWindowText(hwnd) == self.scrcpy_expected_title:
+            QTimer.singleShot(0, lambda: self._embed_scrcpy_window(hwnd))
+
     def find_and_embed_scrcpy(self):
         if not self.scrcpy_process or self.scrcpy_process.poll() is not None:
+            self.scrcpy_embed_timer.stop()
+            self._remove_window_hook()
             print(f"Scrcpy process for instance {self.instance_id + 1} is not running or has terminated.")
             self.placeholder_label.setText(f"Scrcpy process failed or closed for Instance {self.instance_id + 1}.")
             return
 
-        self.scrcpy_hwnd = None
-
-        def enum_windows_callback(hwnd, extra):
-            if win32gui.GetWindowText(hwnd) == self.scrcpy_expected_title:
-                self.scrcpy_hwnd = hwnd
-                return False
-            return True
-
-        win32gui.EnumWindows(enum_windows_callback, None)
-
-        if self.scrcpy_hwnd:
-            self.scrcpy_qwindow = QWindow.fromWinId(self.scrcpy_hwnd)
-            self.scrcpy_container_widget = QWidget.createWindowContainer(self.scrcpy_qwindow, self)
-            self.scrcpy_container_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            self.scrcpy_container_widget.setMinimumSize(100, 100)
-            self.main_content_layout.replaceWidget(self.placeholder_label, self.scrcpy_container_widget)
-            self.placeholder_label.hide()
-
-            win32gui.ShowWindow(self.scrcpy_hwnd, win32con.SW_SHOW)
-            self.resize_scrcpy_native_window()
-            self.scrcpy_container_ready.emit()
-
-            try:
-                win32gui.SetFocus(self.scrcpy_hwnd)
-                print(f"Set native focus to Scrcpy window HWND: {self.scrcpy_hwnd}")
-            except Exception as e:
-                print(f"Warning: Could not set native focus to Scrcpy window: {e}")
+        self._embed_attempts += 1
+        hwnd = _WindowIndex.find(self.scrcpy_expected_title)
+
+        if hwnd:
+            self._embed_scrcpy_window(hwnd)
+        elif self._embed_attempts >= SCRCPY_EMBED_MAX_ATTEMPTS:
+            self.scrcpy_embed_timer.stop()
+            if self._win_event_hook:
+                # Stop polling, but a slow (e.g. tcpip) start can still show the window later: the hook embeds it
+                print(f"Scrcpy window '{self.scrcpy_expected_title}' not shown yet for instance "
+                      f"{self.instance_id + 1}, waiting for it without polling.")
+                return
+            # Nothing would embed the window anymore, don't leave scrcpy running as a floating window
+            print(f"Error: Scrcpy window '{self.scrcpy_expected_title}' not found for instance {self.instance_id + 1}.")
+            self.request_stop()
+            self.placeholder_label.setText(f"Scrcpy window not found for Instance {self.instance_id + 1}.")
+
+    def _embed_scrcpy_window(self, hwnd):
+        if self.scrcpy_hwnd or not self.scrcpy_process:
+            return  # Already embedded by the hook or the poll, or stopped in the meantime
+
+        self.scrcpy_embed_timer.stop()
+        self._remove_window_hook()
+        self.scrcpy_hwnd = hwnd
+        self._last_embedded_size = (0, 0)  # New native window, it has to be sized at least once
+        self.scrcpy_qwindow = QWindow.fromWinId(self.scrcpy_hwnd)
+        self.scrcpy_container_widget = QWidget.createWindowContainer(self.scrcpy_qwindow, self)
+        self.scrcpy_container_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.scrcpy_container_widget.setMinimumSize(100, 100)
+        self.main_content_layout.replaceWidget(self.placeholder_label, self.scrcpy_container_widget)
+        self.placeholder_label.hide()
+
+        if self.isVisible():
+            self._show_scrcpy_native_window()
         else:
-            QTimer.singleShot(1000, self.find_and_embed_scrcpy)
+            # The page was hidden before the window existed, so its hideEvent couldn't hide it: do it now.
+            # showEvent shows and sizes it once the page is switched to.
+            win32gui.ShowWindow(self.scrcpy_hwnd, win32con.SW_HIDE)
+        self.scrcpy_container_ready.emit()
+        if not self.isVisible():
+            return  # Don't hand the focus to a window on a page that isn't shown
 
-    def eventFilter(self, source, event):
-        if source == self and event.type() == QEvent.Resize:
-            self.resize_scrcpy_native_window()
-            return True
-        return super().eventFilter(source, event)
+        try:
+            win32gui.SetFocus(self.scrcpy_hwnd)
+            print(f"Set native focus to Scrcpy window HWND: {self.scrcpy_hwnd}")
+        except Exception as e:
+            print(f"Warning: Could not set native focus to Scrcpy window: {e}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._resize_debounce.start()
 
     def resize_scrcpy_native_window(self):
         if not self.scrcpy_hwnd or not self.scrcpy_container_widget:
             return
 
         container_rect = self.scrcpy_container_widget.rect()
-        width, height = container_rect.width(), container_rect.height()
+        size = (container_rect.width(), container_rect.height())
+        if size == self._last_embedded_size:
+            return  # Spurious resize, the native window already has this size
 
         try:
-            win32gui.MoveWindow(self.scrcpy_hwnd, 0, 0, width, height, True)
+            # Size only: keep the z-order and activation as they are and skip WM_WINDOWPOSCHANGING.
+            # No forced redraw either, scrcpy renders its next frame at the new size by itself.
+            win32gui.SetWindowPos(self.scrcpy_hwnd, 0, 0, 0, size[0], size[1],
+                                  win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE | win32con.SWP_NOSENDCHANGING
+                                  | win32con.SWP_NOREDRAW)
+            self._last_embedded_size = size
         except Exception as e:
             print(f"Error resizing scrcpy_hwnd: {e}")
 
+    def _show_scrcpy_native_window(self):
+        """Shows the embedded window and sizes it to the container with a single SetWindowPos."""
+        container_rect = self.scrcpy_container_widget.rect()
+        size = (container_rect.width(), container_rect.height())
+        try:
+            win32gui.SetWindowPos(self.scrcpy_hwnd, 0, 0, 0, size[0], size[1],
+                                  win32con.SWP_SHOWWINDOW | win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE
+                                  | win32con.SWP_NOSENDCHANGING)
+            self._last_embedded_size = size
+        except Exception as e:
+            print(f"Error showing scrcpy_hwnd: {e}")
+
     def showEvent(self, event):
         super().showEvent(event)
-        if self.scrcpy_hwnd:
-            win32gui.ShowWindow(self.scrcpy_hwnd, win32con.SW_SHOW)
-            self.resize_scrcpy_native_window()
+        if self.scrcpy_hwnd and self.scrcpy_container_widget:
+            self._show_scrcpy_native_window()
 
     def hideEvent(self, event):
         super().hideEvent(event)
@@ -197,6 +334,16 @@ class MainContentAreaWidget(QWidget):
             win32gui.ShowWindow(self.scrcpy_hwnd, win32con.SW_HIDE)
 
     def stop_scrcpy(self):
+        self.request_stop()
+        self.await_stopped()
+
+    def request_stop(self):
+        """
+        Releases the embedded Scrcpy window and asks the Scrcpy process to terminate, without waiting for it.
+        Call await_stopped afterwards to wait for the process to exit.
+        """
+        self.scrcpy_embed_timer.stop()
+        self._remove_window_hook()
         if self.scrcpy_process and self.scrcpy_process.poll() is None:
             self.scrcpy_output_timer.stop()
 
@@ -205,23 +352,22 @@ class MainContentAreaWidget(QWidget):
                 win32gui.SetParent(self.scrcpy_hwnd, 0)
 
             self.scrcpy_process.terminate()
-            try:
-                self.scrcpy_process.wait(timeout=2)
-            except subprocess.TimeoutExpired:
-                self.scrcpy_process.kill()
-
-            self.scrcpy_process = None
-            self.scrcpy_hwnd = None
-            self.scrcpy_qwindow = None
-            self.scrcpy_container_widget = None
-            self.scrcpy_display_id = None
-            self.scrcpy_stdout_reader = None
-            self.scrcpy_stderr_reader = None
-        elif self.scrcpy_process:
-            self.scrcpy_process = None
-            self.scrcpy_hwnd = None
-            self.scrcpy_qwindow = None
-            self.scrcpy_container_widget = None
-            self.scrcpy_display_id = None
-            self.scrcpy_stdout_reader = None
-            self.scrcpy_stderr_reader = None
+            self._stopping_scrcpy_process = self.scrcpy_process
+
+        self.scrcpy_process = None
+        self.scrcpy_hwnd = None
+        self.scrcpy_qwindow = None
+        self.scrcpy_container_widget = None
+        self.scrcpy_display_id = None
+        self.scrcpy_stdout_reader = None
+
+    def await_stopped(self, timeout: float = 2):
+        """Waits for the process terminated by request_stop to exit, killing it after timeout seconds."""
+        process = self._stopping_scrcpy_process
+        if not process:
+            return
+        self._stopping_scrcpy_process = None
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
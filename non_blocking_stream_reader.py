@@ -1,17 +1,18 @@
-import queue
+import collections
 import threading
 
 
 class NonBlockingStreamReader:
     def __init__(self, stream):
         self._stream = stream
-        self._queue = queue.Queue()
+        # Single producer, single consumer: deque.append/popleft are atomic, no lock needed per line
+        self._queue = collections.deque()
 
         def _populateQueue(stream, q):
-            # Read until EOF
-            for line in iter(stream.readline, b''):
-                if line:  # Ensure line is not empty before putting in queue
-                    q.put(line)
+            # Read until EOF. Iterating the stream ends on both text ('') and bytes (b'') EOF,
+            # unlike iter(stream.readline, b'') which spins forever on a text stream
+            for line in stream:
+                q.append(line)
             stream.close()
 
         self._thread = threading.Thread(target=_populateQueue, args=(self._stream, self._queue))
@@ -21,6 +22,6 @@ class NonBlockingStreamReader:
     def readline(self):
         try:
             # Get line from queue, non-blocking
-            return self._queue.get(block=False)
-        except queue.Empty:
+            return self._queue.popleft()
+        except IndexError:
             return None
@@ -1,11 +1,36 @@
 import math
+import weakref
 
-from PyQt5.QtCore import pyqtSignal, Qt, QPoint, QRectF, QPointF, QSizeF
-from PyQt5.QtGui import QKeySequence, QPainter, QColor, QFontMetrics, QMouseEvent, QKeyEvent, QPen
+from PyQt5.QtCore import pyqtSignal, Qt, QPoint, QRect, QRectF, QPointF, QTimer
+from PyQt5.QtGui import QKeySequence, QPainter, QBrush, QColor, QFont, QFontMetrics, QMouseEvent, QKeyEvent, QPen, QPixmap, \
+    QPixmapCache
 from PyQt5.QtWidgets import QWidget
 
 from keymap import Keymap
 
+# Room around a cached keymap pixmap so the border pen and antialiasing aren't clipped
+KEYMAP_PIXMAP_MARGIN = 2
+# Size of each edit mode grid cell
+GRID_SIZE = 50
+# How far a keymap's painting can reach outside its rect: the selection highlight and the X/Hold buttons
+KEYMAP_PAINT_MARGIN = 13
+# Number of fitted font sizes kept before the cache is cleared
+FONT_SIZE_CACHE_LIMIT = 256
+# Qt.Key code -> display text. Modifiers get short names, other keys are filled in on first use
+_KEY_TEXT_CACHE = {Qt.Key_Shift: "S", Qt.Key_Control: "C", Qt.Key_Alt: "A"}
+
+# Fixed edit mode colors, built once instead of on every paint
+_DIM_BRUSH = QBrush(QColor(0, 0, 0, 60))  # Black with 60 alpha (more transparent)
+_GRID_COLOR = QColor(100, 100, 100, 80)  # Light grey, semi-transparent
+_SELECTED_PEN_COLOR = QColor(255, 255, 0)  # Yellow highlight
+_SELECTED_FILL_COLOR = QColor(255, 255, 0, 50)  # Light yellow fill
+_DRAGGING_PEN_COLOR = QColor(0, 255, 255)  # Cyan highlight for dragging
+_DRAGGING_FILL_COLOR = QColor(0, 255, 255, 50)
+_DELETE_BUTTON_COLOR = QColor(255, 0, 0, 200)
+_HOLD_ON_BUTTON_COLOR = QColor(0, 200, 0, 200)  # Green if hold
+_HOLD_OFF_BUTTON_COLOR = QColor(100, 100, 100, 200)  # Grey if not
+_BUTTON_TEXT_COLOR = QColor(255, 255, 255)
+
 
 class OverlayWidget(QWidget):
     keymaps_changed = pyqtSignal(list)  # Signal to notify parent of keymap changes
@@ -35,32 +60,129 @@ class OverlayWidget(QWidget):
         self._creating_keymap = False
         self._drag_start_pos_local = QPoint()  # Stores the QPoint of mousePressEvent (pixel)
         self._keymap_original_pixel_pos = QPoint()  # Original pixel position of keymap when drag starts
+        self._last_drag_pos = QPoint()  # Pointer position the dragged keymap was last laid out for
         self._selected_keymap_for_combo_edit = None
         self._pending_modifier_key = None  # To handle Shift+A, Ctrl+B etc.
         self.general_settings = general_settings if general_settings is not None else {}
-        # Enable mouse tracking to show appropriate cursor in edit mode
-        self.setMouseTracking(True)
+        self._update_keymap_colors()
+        self._pixel_rects = None  # Cached pixel rects, parallel to self.keymaps. None when they need recomputing
+        self._pixel_hit_rects = None  # Integer versions of self._pixel_rects, for hit-testing
+        self._pixel_paint_rects = None  # Integer areas each keymap paints over, for skipping clean keymaps
+        self._button_rect = QRectF()  # Reused for the X and Hold buttons instead of a new QRectF per paint
+        self._font_metrics = {}  # QFont.key() -> QFontMetrics, shared by every font-size fit
+        self._font_size_cache = {}  # (font family, text, max width, max height) -> fitted point size
+        # Keymap -> (pixmap key, rendered pixmap), dropped automatically when a keymap is deleted
+        self._keymap_pixmaps = weakref.WeakKeyDictionary()
+        self._repaint_pending = False  # A coalesced repaint is queued for the next event loop iteration
+        self._dirty_rect = QRect()  # Area the queued repaint has to cover
+        self._grid_tile = self._create_grid_tile()
+        # No mouse tracking: mouseMoveEvent only acts on drags, so plain hover moves would only cost a Python call
+        self.setMouseTracking(False)
 
     def _get_key_text(self, qt_key_code: int) -> str:
         """Converts a Qt.Key code to its string representation for display."""
-        if qt_key_code == Qt.Key_Shift:
-            return "S"
-        elif qt_key_code == Qt.Key_Control:
-            return "C"
-        elif qt_key_code == Qt.Key_Alt:
-            return "A"
-        # For other keys, use QKeySequence to get the standard string
-        return QKeySequence(qt_key_code).toString()
+        text = _KEY_TEXT_CACHE.get(qt_key_code)
+        if text is None:
+            # For other keys, use QKeySequence to get the standard string
+            text = QKeySequence(qt_key_code).toString()
+            _KEY_TEXT_CACHE[qt_key_code] = text
+        return text
 
     def set_keymaps(self, keymaps_list: list):
         """Sets the keymaps from an external source. Assumes it's a shared list."""
         self.keymaps = keymaps_list  # We are given a reference to the shared list
+        self._invalidate_pixel_rects()
         self.update()  # Redraw to show updated keymaps
 
+    def _invalidate_pixel_rects(self):
+        """Marks the cached keymap pixel rects as stale, e.g. after a resize or a keymap change."""
+        self._pixel_rects = None
+        self._pixel_hit_rects = None
+        self._pixel_paint_rects = None
+
+    def _get_pixel_rects(self) -> list:
+        """
+        Returns the pixel rect of every keymap, in the same order as self.keymaps.
+        The normalized -> pixel conversion is done in one pass and cached until the next invalidation.
+        """
+        if self._pixel_rects is None:
+            width, height = self.width(), self.height()
+            self._pixel_rects = [
+                QRectF(keymap.normalized_position.x() * width, keymap.normalized_position.y() * height,
+                       keymap.normalized_size.width() * width, keymap.normalized_size.height() * height)
+                for keymap in self.keymaps
+            ]
+        return self._pixel_rects
+
+    def _get_pixel_hit_rects(self) -> list:
+        """Returns the pixel rects of self._get_pixel_rects() truncated to integers, for cheap hit-testing."""
+        if self._pixel_hit_rects is None:
+            self._pixel_hit_rects = [QRect(int(rect.x()), int(rect.y()), int(rect.width()), int(rect.height()))
+                                     for rect in self._get_pixel_rects()]
+        return self._pixel_hit_rects
+
+    def _get_pixel_paint_rects(self) -> list:
+        """Returns the integer area every keymap paints over (its rect plus KEYMAP_PAINT_MARGIN), cached like the rects."""
+        if self._pixel_paint_rects is None:
+            self._pixel_paint_rects = [rect.toAlignedRect().adjusted(-KEYMAP_PAINT_MARGIN, -KEYMAP_PAINT_MARGIN,
+                                                                     KEYMAP_PAINT_MARGIN, KEYMAP_PAINT_MARGIN)
+                                       for rect in self._get_pixel_rects()]
+        return self._pixel_paint_rects
+
+    def _get_keymap_dirty_rect(self, keymap) -> QRect:
+        """Returns the integer area a keymap paints over at its current position, for partial updates."""
+        width, height = self.width(), self.height()
+        rect = QRectF(keymap.normalized_position.x() * width, keymap.normalized_position.y() * height,
+                      keymap.normalized_size.width() * width, keymap.normalized_size.height() * height)
+        return rect.toAlignedRect().adjusted(-KEYMAP_PAINT_MARGIN, -KEYMAP_PAINT_MARGIN,
+                                             KEYMAP_PAINT_MARGIN, KEYMAP_PAINT_MARGIN)
+
+    @staticmethod
+    def _create_grid_tile() -> QPixmap:
+        """Renders one grid cell, so the whole edit mode grid is a single tiled blit."""
+        tile = QPixmap(GRID_SIZE, GRID_SIZE)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.setPen(_GRID_COLOR)
+        painter.drawLine(0, 0, 0, GRID_SIZE - 1)
+        painter.drawLine(0, 0, GRID_SIZE - 1, 0)
+        painter.end()
+        return tile
+
+    def _schedule_repaint(self, rect: QRect = None):
+        """
+        Queues a repaint of rect (the whole widget if None) for when the pending events are processed.
+        Mouse events arriving before that only grow the dirty rect, so a drag paints at most once per loop.
+        """
+        self._dirty_rect = self._dirty_rect.united(rect if rect is not None else self.rect())
+        if not self._repaint_pending:
+            self._repaint_pending = True
+            QTimer.singleShot(0, self._do_repaint)
+
+    def _do_repaint(self):
+        self._repaint_pending = False
+        self.update(self._dirty_rect)
+        self._dirty_rect = QRect()
+
+    def resizeEvent(self, event):
+        self._invalidate_pixel_rects()
+        super().resizeEvent(event)
+
     def reload_settings(self, general_settings):
         self.general_settings = general_settings if general_settings is not None else {}
+        self._update_keymap_colors()
+        self._keymap_pixmaps.clear()  # The colors may have changed
         self.update()
 
+    def _update_keymap_colors(self):
+        """Builds the keymap pen, fill and text colors from the settings, once per settings load instead of per draw."""
+        color = self.general_settings.get("overlay_bg_color", "#ff0000ff")
+        border_color = self.general_settings.get("overlay_border_color", "#ff0000ff")
+        text_color = self.general_settings.get("overlay_text_color", "#ffffff")
+        self._keymap_border_pen = QPen(QColor(border_color), 2, Qt.SolidLine)  # Thickness 2, solid line
+        self._keymap_fill_color = QColor(color)
+        self._keymap_text_color = QColor(text_color)
+
     def set_edit_mode(self, active: bool):
         """
         Activates or deactivates the keymap editing mode for this specific overlay.
@@ -87,94 +209,81 @@ class OverlayWidget(QWidget):
         self.update()  # Request repaint to show/hide grid/selection
 
     def paintEvent(self, event):
+        if not self.keymaps and not self.edit_mode_active:
+            return  # Nothing to draw, Qt already cleared the translucent background
+
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         painter.setRenderHint(QPainter.TextAntialiasing)
 
+        # Only the dirty region needs repainting, e.g. the old and new position of a dragged keymap
+        region = event.region()
+        dirty_rect = event.rect()
+
         # Draw semi-transparent background if in edit mode (only the edit overlay)
         if self.edit_mode_active:
-            painter.setBrush(QColor(0, 0, 0, 60))  # Black with 60 alpha (more transparent)
-            painter.setPen(Qt.NoPen)
-            painter.drawRect(self.rect())  # Cover the entire widget
-
-            grid_size = 50  # Size of each grid cell
-            painter.setPen(QColor(100, 100, 100, 80))  # Light grey, semi-transparent
-            for x in range(0, self.width(), grid_size):
-                painter.drawLine(x, 0, x, self.height())
-            for y in range(0, self.height(), grid_size):
-                painter.drawLine(0, y, self.width(), y)
-
-        for keymap in self.keymaps:
-            # Convert normalized position and size to pixel coordinates
-            pixel_x = keymap.normalized_position.x() * self.width()
-            pixel_y = keymap.normalized_position.y() * self.height()
-            pixel_width = keymap.normalized_size.width() * self.width()
-            pixel_height = keymap.normalized_size.height() * self.height()
-            keymap_rect = QRectF(pixel_x, pixel_y, pixel_width, pixel_height)
+            painter.fillRect(dirty_rect, _DIM_BRUSH)
+            # Offset the tiles so the grid lines stay aligned to the widget, not to the dirty rect
+            painter.drawTiledPixmap(dirty_rect, self._grid_tile,
+                                    QPoint(dirty_rect.left() % GRID_SIZE, dirty_rect.top() % GRID_SIZE))
+
+        # The background and grid are axis-aligned, only the keymaps and their buttons need antialiasing
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        for keymap, keymap_rect, paint_rect in zip(self.keymaps, self._get_pixel_rects(),
+                                                   self._get_pixel_paint_rects()):
+            if not region.intersects(paint_rect):
+                continue
 
             # Highlight selected keymap in edit mode
             if self.edit_mode_active and keymap == self._selected_keymap_for_combo_edit:
-                painter.setPen(QColor(255, 255, 0))  # Yellow highlight
-                painter.setBrush(QColor(255, 255, 0, 50))  # Light yellow fill
+                painter.setPen(_SELECTED_PEN_COLOR)
+                painter.setBrush(_SELECTED_FILL_COLOR)
                 painter.drawRoundedRect(keymap_rect.adjusted(-5, -5, 5, 5), 5,
                                         5)  # Draw a slightly larger, rounded highlight
             elif self.edit_mode_active and keymap == self._dragging_keymap:
-                painter.setPen(QColor(0, 255, 255))  # Cyan highlight for dragging
-                painter.setBrush(QColor(0, 255, 255, 50))
+                painter.setPen(_DRAGGING_PEN_COLOR)
+                painter.setBrush(_DRAGGING_FILL_COLOR)
                 painter.drawRoundedRect(keymap_rect.adjusted(-3, -3, 3, 3), 3, 3)
 
             if keymap.type == "circle":
-                painter.setPen(Qt.NoPen)
-                color = self.general_settings.get("overlay_bg_color", "#ff0000ff")
-                border_color = self.general_settings.get("overlay_border_color", "#ff0000ff")
-                border_pen = QPen(QColor(border_color), 2, Qt.SolidLine)  # Thickness 2, solid line
-
-                painter.setPen(border_pen)
-                painter.setBrush(QColor(color))  # Red, 120 alpha
-                painter.drawEllipse(keymap_rect)  # Draw ellipse using the keymap's rect
-                # Prepare and draw text for the key combination
-                key_texts = [self._get_key_text(kc) for kc in keymap.keycombo]
-                display_text = "+".join(key_texts) if key_texts else "KEY"  # Default text if no key is set
-
-                # Dynamically adjust font size to fit text within the keymap rectangle
-                font = painter.font()
-                font.setFamily("Inter")  # Use a clean, readable font
-                max_font_size = 72  # Start with a large font size
-                min_font_size = 6  # Minimum readable font size
-
-                for font_size in range(max_font_size, min_font_size - 1, -1):
-                    font.setPointSize(font_size)
-                    painter.setFont(font)
-                    metrics = QFontMetrics(font)
-                    text_bounding_rect = metrics.boundingRect(display_text)
-                    if text_bounding_rect.width() <= keymap_rect.width() * 0.9 and \
-                            text_bounding_rect.height() <= keymap_rect.height() * 0.9:
-                        break  # Found a font size that fits
-                text_color = self.general_settings.get("overlay_text_color", "#ffffff")
-                painter.setPen(QColor(text_color))  # White text for key combo
-                painter.drawText(keymap_rect, Qt.AlignCenter, display_text)
+                if keymap is self._dragging_keymap and self._creating_keymap:
+                    # Its size changes on every mouse move, caching it would only fill the cache
+                    self._draw_keymap_circle(painter, keymap_rect, self._get_display_text(keymap))
+                else:
+                    # Reuse this keymap's pixmap as long as its size and key combination are unchanged
+                    pixmap_key = (keymap_rect.width(), keymap_rect.height(), tuple(keymap.keycombo))
+                    cached = self._keymap_pixmaps.get(keymap)
+                    if cached is None or cached[0] != pixmap_key:
+                        cached = (pixmap_key, self._get_keymap_pixmap(self._get_display_text(keymap),
+                                                                      keymap_rect.width(), keymap_rect.height()))
+                        self._keymap_pixmaps[keymap] = cached
+                    pixmap = cached[1]
+                    painter.drawPixmap(keymap_rect.topLeft() - QPointF(KEYMAP_PIXMAP_MARGIN, KEYMAP_PIXMAP_MARGIN),
+                                       pixmap)
 
             # Draw the 'X' button if in edit mode and this keymap is selected
             if self.edit_mode_active and keymap == self._selected_keymap_for_combo_edit:
                 x_button_size_pixels = 25
-                x_button_rect = QRectF(
+                x_button_rect = self._button_rect
+                x_button_rect.setRect(
                     keymap_rect.right() - x_button_size_pixels / 2,
                     keymap_rect.top() - x_button_size_pixels / 2,
                     x_button_size_pixels,
                     x_button_size_pixels
                 )
                 painter.setPen(Qt.NoPen)
-                painter.setBrush(QColor(255, 0, 0, 200))
+                painter.setBrush(_DELETE_BUTTON_COLOR)
                 painter.drawEllipse(x_button_rect)
                 font = painter.font()
                 font.setPointSize(int(x_button_size_pixels * 0.7))
                 painter.setFont(font)
-                painter.setPen(QColor(255, 255, 255))
+                painter.setPen(_BUTTON_TEXT_COLOR)
                 painter.drawText(x_button_rect, Qt.AlignCenter, "X")
 
                 # --- NEW: Draw the 'Hold' button ---
                 hold_button_size_pixels = 25
-                hold_button_rect = QRectF(
+                hold_button_rect = self._button_rect  # The X button is drawn, its rect can be reused
+                hold_button_rect.setRect(
                     keymap_rect.left() - hold_button_size_pixels / 2,  # Top-left position
                     keymap_rect.top() - hold_button_size_pixels / 2,
                     hold_button_size_pixels,
@@ -182,20 +291,105 @@ class OverlayWidget(QWidget):
                 )
 
                 # Choose color based on keymap.hold state
-                hold_button_color = QColor(0, 200, 0, 200) if keymap.hold else QColor(100, 100, 100,
-                                                                                      200)  # Green if hold, grey if not
+                hold_button_color = _HOLD_ON_BUTTON_COLOR if keymap.hold else _HOLD_OFF_BUTTON_COLOR
                 painter.setPen(Qt.NoPen)
                 painter.setBrush(hold_button_color)
                 painter.drawEllipse(hold_button_rect)
 
                 font.setPointSize(int(hold_button_size_pixels * 0.7))  # Reuse font object
                 painter.setFont(font)
-                painter.setPen(QColor(255, 255, 255))  # White text
+                painter.setPen(_BUTTON_TEXT_COLOR)
                 painter.drawText(hold_button_rect, Qt.AlignCenter, "H")  # 'H' for Hold
                 # --- END NEW ---
 
         painter.end()
 
+    def _get_display_text(self, keymap: Keymap) -> str:
+        """Returns the text drawn on a keymap for its key combination."""
+        key_texts = [self._get_key_text(kc) for kc in keymap.keycombo]
+        return "+".join(key_texts) if key_texts else "KEY"  # Default text if no key is set
+
+    def _draw_keymap_circle(self, painter: QPainter, keymap_rect: QRectF, display_text: str):
+        """Draws a circle keymap (filled ellipse with a border and its key text) into keymap_rect."""
+        painter.setPen(self._keymap_border_pen)
+        painter.setBrush(self._keymap_fill_color)
+        painter.drawEllipse(keymap_rect)  # Draw ellipse using the keymap's rect
+
+        # Dynamically adjust font size to fit text within the keymap rectangle
+        font = painter.font()
+        font.setFamily("Inter")  # Use a clean, readable font
+        best_font_size = self._fit_font_size(font, display_text, keymap_rect.width() * 0.9, keymap_rect.height() * 0.9)
+        font.setPointSize(best_font_size)
+        painter.setFont(font)
+        painter.setPen(self._keymap_text_color)
+        painter.drawText(keymap_rect, Qt.AlignCenter, display_text)
+
+    def _fit_font_size(self, font: QFont, display_text: str, max_text_width: float, max_text_height: float) -> int:
+        """
+        Returns the largest point size (6 to 72) at which display_text fits in max_text_width x max_text_height.
+        Results are remembered per text and box, so re-rendering an evicted or resized-back pixmap skips the fit.
+        """
+        fit_key = (font.family(), display_text, max_text_width, max_text_height)
+        best_font_size = self._font_size_cache.get(fit_key)
+        if best_font_size is not None:
+            return best_font_size
+
+        max_font_size = 72  # Largest font size to try
+        min_font_size = 6  # Minimum readable font size, used when nothing fits
+
+        # Text size scales about linearly with the font size, so derive the size from one measurement
+        # at the largest size, then step down in the rare case rounding still leaves it too big
+        font.setPointSize(max_font_size)
+        metrics = self._get_font_metrics(font)
+        # Advance width and line height are enough to fit the text, no need for its ink bounds
+        text_width, text_height = metrics.horizontalAdvance(display_text), metrics.height()
+        scale = min(max_text_width / text_width if text_width > 0 else 1.0,
+                    max_text_height / text_height if text_height > 0 else 1.0)
+        best_font_size = max(min_font_size, min(max_font_size, int(max_font_size * scale)))
+        while best_font_size > min_font_size:
+            font.setPointSize(best_font_size)
+            metrics = self._get_font_metrics(font)
+            if metrics.horizontalAdvance(display_text) <= max_text_width and metrics.height() <= max_text_height:
+                break
+            best_font_size -= 1
+
+        if len(self._font_size_cache) >= FONT_SIZE_CACHE_LIMIT:
+            self._font_size_cache.clear()  # Creating a keymap passes through many sizes, don't keep them all
+        self._font_size_cache[fit_key] = best_font_size
+        return best_font_size
+
+    def _get_font_metrics(self, font: QFont) -> QFontMetrics:
+        """Returns the QFontMetrics of font, creating it only the first time this exact font is asked for."""
+        font_key = font.key()
+        metrics = self._font_metrics.get(font_key)
+        if metrics is None:
+            metrics = self._font_metrics[font_key] = QFontMetrics(font)
+        return metrics
+
+    def _get_keymap_pixmap(self, display_text: str, width: float, height: float) -> QPixmap:
+        """
+        Returns a circle keymap rendered into a transparent pixmap, padded by KEYMAP_PIXMAP_MARGIN on every side.
+        The pixmap is rendered once per text, size and colors and then served from QPixmapCache.
+        """
+        cache_key = "keymap_{}_{:.2f}x{:.2f}_{}_{}_{}".format(
+            display_text, width, height,
+            self.general_settings.get("overlay_bg_color", "#ff0000ff"),
+            self.general_settings.get("overlay_border_color", "#ff0000ff"),
+            self.general_settings.get("overlay_text_color", "#ffffff"))
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap(math.ceil(width) + 2 * KEYMAP_PIXMAP_MARGIN, math.ceil(height) + 2 * KEYMAP_PIXMAP_MARGIN)
+            pixmap.fill(Qt.transparent)
+            pixmap_painter = QPainter(pixmap)
+            pixmap_painter.setRenderHint(QPainter.Antialiasing)
+            pixmap_painter.setRenderHint(QPainter.TextAntialiasing)
+            pixmap_painter.setFont(self.font())
+            self._draw_keymap_circle(pixmap_painter, QRectF(KEYMAP_PIXMAP_MARGIN, KEYMAP_PIXMAP_MARGIN, width, height),
+                                     display_text)
+            pixmap_painter.end()
+            QPixmapCache.insert(cache_key, pixmap)
+        return pixmap
+
     def mousePressEvent(self, event: QMouseEvent):
         if not self.edit_mode_active:
             super().mousePressEvent(event)
@@ -203,14 +397,11 @@ class OverlayWidget(QWidget):
 
         if event.button() == Qt.LeftButton:
             self._drag_start_pos_local = event.pos()
+            self._last_drag_pos = event.pos()
 
             if self._selected_keymap_for_combo_edit:
                 selected_keymap = self._selected_keymap_for_combo_edit
-                pixel_x = selected_keymap.normalized_position.x() * self.width()
-                pixel_y = selected_keymap.normalized_position.y() * self.height()
-                pixel_width = selected_keymap.normalized_size.width() * self.width()
-                pixel_height = selected_keymap.normalized_size.height() * self.height()
-                selected_keymap_pixel_rect = QRectF(pixel_x, pixel_y, pixel_width, pixel_height)
+                selected_keymap_pixel_rect = self._get_pixel_rects()[self.keymaps.index(selected_keymap)]
 
                 x_button_size_pixels = 25
                 x_button_rect = QRectF(
@@ -232,9 +423,10 @@ class OverlayWidget(QWidget):
 
                 if x_button_rect.contains(event.pos()):
                     self.keymaps.remove(selected_keymap)
+                    self._invalidate_pixel_rects()
                     self._selected_keymap_for_combo_edit = None
                     self.keymaps_changed.emit(self.keymaps)
-                    self.update()
+                    self._schedule_repaint()
                     event.accept()
                     return
                 # --- NEW: Handle Hold button click ---
@@ -242,7 +434,7 @@ class OverlayWidget(QWidget):
                     selected_keymap.hold = not selected_keymap.hold  # Toggle the hold attribute
                     print(f"Keymap hold state toggled to: {selected_keymap.hold}")
                     self.keymaps_changed.emit(self.keymaps)  # Emit to save change
-                    self.update()
+                    self._schedule_repaint()
                     event.accept()
                     return
                 # --- END NEW ---
@@ -250,16 +442,11 @@ class OverlayWidget(QWidget):
             self._selected_keymap_for_combo_edit = None
             clicked_on_existing_keymap = False
 
-            for keymap in self.keymaps:
-                pixel_x = keymap.normalized_position.x() * self.width()
-                pixel_y = keymap.normalized_position.y() * self.height()
-                pixel_width = keymap.normalized_size.width() * self.width()
-                pixel_height = keymap.normalized_size.height() * self.height()
-                keymap_rect = QRectF(pixel_x, pixel_y, pixel_width, pixel_height)
-
-                if keymap_rect.contains(event.pos()):
+            click_pos = event.pos()
+            for keymap, hit_rect in zip(self.keymaps, self._get_pixel_hit_rects()):
+                if hit_rect.contains(click_pos):
                     self._dragging_keymap = keymap
-                    self._keymap_original_pixel_pos = QPoint(int(pixel_x), int(pixel_y))
+                    self._keymap_original_pixel_pos = hit_rect.topLeft()
                     clicked_on_existing_keymap = True
                     break
 
@@ -272,9 +459,10 @@ class OverlayWidget(QWidget):
                                                          event.pos().y() / self.height()),
                                     hold=False)  # Ensure new keymaps have a hold attribute
                 self.keymaps.append(new_keymap)
+                self._invalidate_pixel_rects()
                 self._dragging_keymap = new_keymap
 
-            self.update()
+            self._schedule_repaint()
 
     def mouseMoveEvent(self, event: QMouseEvent):
         if not self.edit_mode_active:
@@ -282,38 +470,36 @@ class OverlayWidget(QWidget):
             return
 
         if self._dragging_keymap:
+            if event.pos() == self._last_drag_pos:
+                event.accept()
+                return  # The pointer didn't move, the keymap would land where it already is
+            self._last_drag_pos = event.pos()
+
+            old_dirty_rect = self._get_keymap_dirty_rect(self._dragging_keymap)
             if self._creating_keymap:
                 dx = event.pos().x() - self._drag_start_pos_local.x()
                 dy = event.pos().y() - self._drag_start_pos_local.y()
                 side_length = min(abs(dx), abs(dy))
-
-                current_pixel_x = self._drag_start_pos_local.x()
-                if dx < 0:
-                    current_pixel_x = self._drag_start_pos_local.x() - side_length
-
-                current_pixel_y = self._drag_start_pos_local.y()
-                if dy < 0:
-                    current_pixel_y = self._drag_start_pos_local.y() - side_length
-
-                self._dragging_keymap.normalized_position = QPointF(current_pixel_x / self.width(),
-                                                                    current_pixel_y / self.height())
-                self._dragging_keymap.normalized_size = QSizeF(side_length / self.width(),
-                                                               side_length / self.height())
-
-                min_norm_size_w = 10 / self.width()
-                min_norm_size_h = 10 / self.height()
-                if self._dragging_keymap.normalized_size.width() < min_norm_size_w:
-                    self._dragging_keymap.normalized_size.setWidth(min_norm_size_w)
-                if self._dragging_keymap.normalized_size.height() < min_norm_size_h:
-                    self._dragging_keymap.normalized_size.setHeight(min_norm_size_h)
+                # Grow towards the cursor, and clamp to the 10 px minimum in pixels before normalizing
+                current_pixel_x = self._drag_start_pos_local.x() - (side_length if dx < 0 else 0)
+                current_pixel_y = self._drag_start_pos_local.y() - (side_length if dy < 0 else 0)
+                clamped_side_length = max(side_length, 10)
+
+                width, height = self.width(), self.height()
+                # Update the keymap's QPointF/QSizeF in place instead of allocating new ones on every move
+                self._dragging_keymap.normalized_position.setX(current_pixel_x / width)
+                self._dragging_keymap.normalized_position.setY(current_pixel_y / height)
+                self._dragging_keymap.normalized_size.setWidth(clamped_side_length / width)
+                self._dragging_keymap.normalized_size.setHeight(clamped_side_length / height)
             else:
-                delta = event.pos() - self._drag_start_pos_local
-                new_pixel_x = self._keymap_original_pixel_pos.x() + delta.x()
-                new_pixel_y = self._keymap_original_pixel_pos.y() + delta.y()
-                self._dragging_keymap.normalized_position = QPointF(new_pixel_x / self.width(),
-                                                                    new_pixel_y / self.height())
+                # Integer QPoint arithmetic, only the final position is converted to normalized floats
+                new_pixel_pos = self._keymap_original_pixel_pos + (event.pos() - self._drag_start_pos_local)
+                self._dragging_keymap.normalized_position.setX(new_pixel_pos.x() / self.width())
+                self._dragging_keymap.normalized_position.setY(new_pixel_pos.y() / self.height())
 
-            self.update()
+            self._invalidate_pixel_rects()
+            # Repaint only where the keymap was and where it is now
+            self._schedule_repaint(old_dirty_rect.united(self._get_keymap_dirty_rect(self._dragging_keymap)))
 
         super().mouseMoveEvent(event)
 
@@ -325,16 +511,14 @@ class OverlayWidget(QWidget):
         if event.button() == Qt.LeftButton:
             release_pos = event.pos()
 
-            try:
-                distance_moved = QPointF(release_pos - self._drag_start_pos_local).norm()
-            except AttributeError:
-                dx = release_pos.x() - self._drag_start_pos_local.x()
-                dy = release_pos.y() - self._drag_start_pos_local.y()
-                distance_moved = math.sqrt(dx * dx + dy * dy)
+            # Squared distance, compared against the squared 5 px click threshold, no square root needed
+            dx = release_pos.x() - self._drag_start_pos_local.x()
+            dy = release_pos.y() - self._drag_start_pos_local.y()
+            is_click = dx * dx + dy * dy < 5 * 5
 
             if self._dragging_keymap:
                 if self._creating_keymap:
-                    if distance_moved < 5:
+                    if is_click:
                         self.keymaps.remove(self._dragging_keymap)
                         default_pixel_diameter = self.general_settings.get("default_keymap_size", 100)
                         new_norm_width = default_pixel_diameter / self.width()
@@ -346,16 +530,17 @@ class OverlayWidget(QWidget):
                                             normalized_position=(new_norm_x, new_norm_y),
                                             hold=False)  # Ensure new keymaps have a hold attribute
                         self.keymaps.append(new_keymap)
+                        self._invalidate_pixel_rects()
                         self._selected_keymap_for_combo_edit = new_keymap
                     else:
                         self._selected_keymap_for_combo_edit = self._dragging_keymap
                 else:
-                    if distance_moved < 5:
+                    if is_click:
                         self._selected_keymap_for_combo_edit = self._dragging_keymap
 
                 self._dragging_keymap = None
                 self._creating_keymap = False
-                self.update()
+                self._schedule_repaint()
                 self.keymaps_changed.emit(self.keymaps)
 
         super().mouseReleaseEvent(event)
@@ -367,6 +552,7 @@ class OverlayWidget(QWidget):
 
         if event.key() == Qt.Key_Delete and self._selected_keymap_for_combo_edit:
             self.keymaps.remove(self._selected_keymap_for_combo_edit)
+            self._invalidate_pixel_rects()
             self._selected_keymap_for_combo_edit = None
             self.update()
             self.keymaps_changed.emit(self.keymaps)
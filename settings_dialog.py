@@ -45,15 +45,7 @@ class SettingsDialog(QDialog):
         # Apply a specific stylesheet for the dialog to ensure labels are visible
         # and inputs have a clear appearance, overriding any potential main app stylesheet issues.
         # Store the initial settings and a placeholder for the new settings on save
-        # Handle both old list format and new dict format
-        if isinstance(current_settings, dict) and "instances" in current_settings:
-            self.initial_instance_settings = current_settings.get("instances", [])
-            self.initial_general_settings = current_settings.get("general_settings", {})
-        else:
-            self.initial_instance_settings = current_settings or []
-            self.initial_general_settings = {}  # Default empty general settings
-
-        self.final_settings = {}  # This will store both instance and general settings
+        self._store_initial_settings(current_settings)
 
         print("Initializing settings")
         # --- Main Layout ---
@@ -97,6 +89,43 @@ class SettingsDialog(QDialog):
         # Populate the tabs with the provided settings
         self._load_initial_instance_settings()
 
+    def _store_initial_settings(self, current_settings):
+        """Stores the settings the dialog starts from and clears the settings of a previous save."""
+        # Handle both old list format and new dict format
+        if isinstance(current_settings, dict) and "instances" in current_settings:
+            self.initial_instance_settings = current_settings.get("instances", [])
+            self.initial_general_settings = current_settings.get("general_settings", {})
+        else:
+            self.initial_instance_settings = current_settings or []
+            self.initial_general_settings = {}  # Default empty general settings
+
+        self.final_settings = {}  # This will store both instance and general settings
+
+    def reset_with(self, current_settings=None):
+        """
+        Re-populates the dialog with new settings, reusing the existing tabs and fields instead of rebuilding them.
+        This lets a single dialog instance be shown again and again.
+
+        Args:
+            current_settings (list or dict, optional): Same as the current_settings argument of __init__.
+        """
+        self._store_initial_settings(current_settings)
+        self._populate_general_tab(self.tab_widget.widget(0), self.initial_general_settings)
+
+        instance_settings_list = self.initial_instance_settings or [{}]  # One default tab when there are none
+        # Drop the instance tabs that are no longer needed
+        while self.tab_widget.count() - 1 > len(instance_settings_list):
+            self.tab_widget.removeTab(self.tab_widget.count() - 1)
+        for i, settings_data in enumerate(instance_settings_list, start=1):  # Start from 1 to skip General tab
+            instance_name = settings_data.get("instance_name", f"Instance {i}")
+            if i < self.tab_widget.count():
+                tab_page = self.tab_widget.widget(i)
+                self._populate_instance_tab(tab_page, settings_data, instance_name)
+                self.tab_widget.setTabText(i, instance_name)
+            else:
+                self.tab_widget.addTab(self._create_instance_tab(settings_data), instance_name)
+        self.tab_widget.setCurrentIndex(0)
+
     def _add_general_tab(self):
         """Adds the General settings tab."""
         general_tab_widget = self._create_general_tab(self.initial_general_settings)
@@ -132,34 +161,29 @@ class SettingsDialog(QDialog):
             return button
 
         # Background Color
-        # Ensure default color has full opacity if loaded from settings without alpha, or use a default with alpha
-        initial_bg_color = QColor(settings.get("overlay_bg_color", "#3498dbFF"))
         bg_color_btn = create_color_picker_row(
             "Overlay Background Color:",
-            initial_bg_color
+            QColor(Qt.black)
         )
         tab_page.overlay_bg_color_field = bg_color_btn  # Store button reference
 
         # Border Color
-        initial_border_color = QColor(settings.get("overlay_border_color", "#2c3e50FF"))
         border_color_btn = create_color_picker_row(
             "Overlay Border Color:",
-            initial_border_color
+            QColor(Qt.black)
         )
         tab_page.overlay_border_color_field = border_color_btn  # Store button reference
 
         # Text Color
-        initial_text_color = QColor(settings.get("overlay_text_color", "#ffffffFF"))
         text_color_btn = create_color_picker_row(
             "Overlay Text Color:",
-            initial_text_color
+            QColor(Qt.black)
         )
         tab_page.overlay_text_color_field = text_color_btn  # Store button reference
 
         # Default New Keymap Size
         default_keymap_size_spinbox = QSpinBox()
         default_keymap_size_spinbox.setRange(1, 500)
-        default_keymap_size_spinbox.setValue(settings.get("default_keymap_size", 50))
         default_keymap_size_spinbox.setSuffix(" px")
         layout.addRow("Default New Keymap Size:", default_keymap_size_spinbox)
         tab_page.default_keymap_size_field = default_keymap_size_spinbox
@@ -168,7 +192,6 @@ class SettingsDialog(QDialog):
         overlay_opacity_spinbox = QDoubleSpinBox()
         overlay_opacity_spinbox.setRange(0.1, 1.0)
         overlay_opacity_spinbox.setSingleStep(0.05)
-        overlay_opacity_spinbox.setValue(settings.get("overlay_opacity", 0.7))
         overlay_opacity_spinbox.setSuffix("")  # No suffix as it's a ratio
         layout.addRow("Overlay Opacity:", overlay_opacity_spinbox)
         tab_page.overlay_opacity_field = overlay_opacity_spinbox
@@ -177,7 +200,6 @@ class SettingsDialog(QDialog):
         hold_duration_ms_spinbox = QSpinBox()
         hold_duration_ms_spinbox.setRange(1, 3000)
         hold_duration_ms_spinbox.setSingleStep(1)
-        hold_duration_ms_spinbox.setValue(settings.get("hold_time", 100))
         hold_duration_ms_spinbox.setSuffix("ms")
         layout.addRow("Hold Tap Time:", hold_duration_ms_spinbox)
         tab_page.hold_duration_field = hold_duration_ms_spinbox
@@ -185,8 +207,22 @@ class SettingsDialog(QDialog):
         # Spacer to push elements to top
         layout.addItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding))
 
+        self._populate_general_tab(tab_page, settings)
         return tab_page
 
+    def _populate_general_tab(self, tab_page: QWidget, settings: dict):
+        """Sets the fields of a General tab created by _create_general_tab from a dictionary of general settings."""
+        # Ensure default color has full opacity if loaded from settings without alpha, or use a default with alpha
+        self._update_color_button_style(tab_page.overlay_bg_color_field,
+                                        QColor(settings.get("overlay_bg_color", "#3498dbFF")))
+        self._update_color_button_style(tab_page.overlay_border_color_field,
+                                        QColor(settings.get("overlay_border_color", "#2c3e50FF")))
+        self._update_color_button_style(tab_page.overlay_text_color_field,
+                                        QColor(settings.get("overlay_text_color", "#ffffffFF")))
+        tab_page.default_keymap_size_field.setValue(settings.get("default_keymap_size", 50))
+        tab_page.overlay_opacity_field.setValue(settings.get("overlay_opacity", 0.7))
+        tab_page.hold_duration_field.setValue(settings.get("hold_time", 100))
+
     def _update_color_button_style(self, button: QPushButton, color: QColor):
         """
         Updates the background color of a QPushButton to reflect the chosen color, including alpha.
@@ -253,7 +289,7 @@ class SettingsDialog(QDialog):
 
         # --- Instance Name ---
         # Adjust count due to General tab
-        instance_name = QLineEdit(settings.get("instance_name", f"Instance {self.tab_widget.count()}"))
+        instance_name = QLineEdit()
         instance_name.setPlaceholderText("e.g., Dofus-1 or Main-Account")
         instance_name.textChanged.connect(lambda text: self.tab_widget.setTabText(self.tab_widget.currentIndex(), text))
         layout.addRow("Instance Name:", instance_name)
@@ -262,11 +298,10 @@ class SettingsDialog(QDialog):
 
         # --- Connection Type (TCP/IP vs USB) ---
         use_tcpip_checkbox = QCheckBox("Enable TCP/IP Connection")
-        use_tcpip_checkbox.setChecked(settings.get("use_tcpip", True))
         layout.addRow(use_tcpip_checkbox)
         tab_page.use_tcpip_field = use_tcpip_checkbox
 
-        tcpip_address_field = QLineEdit(settings.get("tcpip_address", "192.168.1.38"))
+        tcpip_address_field = QLineEdit()
         tcpip_address_field.setPlaceholderText("Enter device IP address")
         tcpip_address_label = QLabel("IP Address:")
         layout.addRow(tcpip_address_label, tcpip_address_field)
@@ -274,32 +309,29 @@ class SettingsDialog(QDialog):
         # Toggle visibility of the IP address field based on the checkbox
         use_tcpip_checkbox.toggled.connect(tcpip_address_field.setVisible)
         use_tcpip_checkbox.toggled.connect(tcpip_address_label.setVisible)
-        tcpip_address_field.setVisible(use_tcpip_checkbox.isChecked())
-        tcpip_address_label.setVisible(use_tcpip_checkbox.isChecked())
         tab_page.tcpip_address_field = tcpip_address_field
+        tab_page.tcpip_address_label = tcpip_address_label
 
         # --- Video Settings ---
         video_codec_combo = QComboBox()
         video_codec_combo.addItems(["h265", "h264", "av1"])
-        video_codec_combo.setCurrentText(settings.get("video_codec", "h265"))
         layout.addRow("Video Codec:", video_codec_combo)
         tab_page.video_codec_field = video_codec_combo
 
         max_fps_spinbox = QSpinBox()
         max_fps_spinbox.setRange(1, 120)
-        max_fps_spinbox.setValue(settings.get("max_fps", 60))
         max_fps_spinbox.setSuffix(" FPS")
         layout.addRow("Max Framerate:", max_fps_spinbox)
         tab_page.max_fps_field = max_fps_spinbox
 
         # --- Display Settings ---
-        resolution_field = QLineEdit(settings.get("resolution", "1920x1080"))
+        resolution_field = QLineEdit()
         resolution_field.setPlaceholderText("e.g., 1920x1080")
         layout.addRow("Resolution (WxH):", resolution_field)
         tab_page.resolution_field = resolution_field
 
         # --- App & Window Settings ---
-        start_app_field = QLineEdit(settings.get("start_app", "com.ankama.dofustouch"))
+        start_app_field = QLineEdit()
         start_app_field.setPlaceholderText("e.g., com.android.chrome")
         layout.addRow("Start App on Connect:", start_app_field)
         tab_page.start_app_field = start_app_field
@@ -307,24 +339,51 @@ class SettingsDialog(QDialog):
         # --- Other Boolean Flags ---
         flags_layout = QHBoxLayout()
         turn_screen_off_check = QCheckBox("Turn Screen Off (-S)")
-        turn_screen_off_check.setChecked(settings.get("turn_screen_off", True))
         flags_layout.addWidget(turn_screen_off_check)
         tab_page.turn_screen_off_field = turn_screen_off_check
 
         no_decorations_check = QCheckBox("No System Decorations")
-        no_decorations_check.setChecked(settings.get("no_decorations", False))
         flags_layout.addWidget(no_decorations_check)
         tab_page.no_decorations_field = no_decorations_check
         no_audio_check = QCheckBox("No Audio")
-        no_audio_check.setChecked(settings.get("no_audio", False))
         flags_layout.addWidget(no_audio_check)
         tab_page.no_audio_field = no_audio_check
 
         flags_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
         layout.addRow("Other Flags:", flags_layout)
 
+        # Adjust count due to General tab
+        self._populate_instance_tab(tab_page, settings, f"Instance {self.tab_widget.count()}")
         return tab_page
 
+    def _populate_instance_tab(self, tab_page: QWidget, settings: dict, default_name: str):
+        """
+        Sets the fields of an instance tab created by _create_instance_tab from a dictionary of instance settings.
+
+        Args:
+            tab_page (QWidget): The instance tab page to populate.
+            settings (dict): The instance settings. Missing entries get their defaults.
+            default_name (str): The instance name to use when settings doesn't have one.
+        """
+        # Don't let the name field rename the current tab, the caller sets this tab's own text
+        tab_page.instance_name_field.blockSignals(True)
+        tab_page.instance_name_field.setText(settings.get("instance_name", default_name))
+        tab_page.instance_name_field.blockSignals(False)
+
+        use_tcpip = settings.get("use_tcpip", True)
+        tab_page.use_tcpip_field.setChecked(use_tcpip)
+        tab_page.tcpip_address_field.setText(settings.get("tcpip_address", "192.168.1.38"))
+        tab_page.tcpip_address_field.setVisible(use_tcpip)
+        tab_page.tcpip_address_label.setVisible(use_tcpip)
+
+        tab_page.video_codec_field.setCurrentText(settings.get("video_codec", "h265"))
+        tab_page.max_fps_field.setValue(settings.get("max_fps", 60))
+        tab_page.resolution_field.setText(settings.get("resolution", "1920x1080"))
+        tab_page.start_app_field.setText(settings.get("start_app", "com.ankama.dofustouch"))
+        tab_page.turn_screen_off_field.setChecked(settings.get("turn_screen_off", True))
+        tab_page.no_decorations_field.setChecked(settings.get("no_decorations", False))
+        tab_page.no_audio_field.setChecked(settings.get("no_audio", False))
+
     def _add_new_tab(self, is_default=False):
         """Adds a new, empty tab to the tab widget."""
         # For the first default tab, don't show a confirmation if the user tries to remove it
@@ -379,9 +438,12 @@ class SettingsDialog(QDialog):
             instance_settings_list.append(settings_data)
         self.final_settings["instances"] = instance_settings_list
 
-        print("Settings saved:")
-        with open(resource_path('settings.json'), 'w') as f:
-            json.dump(self.final_settings, f, indent=2)
+        # Opening the dialog and saving without edits is common, don't rewrite an identical file then
+        if self.final_settings != {"general_settings": self.initial_general_settings,
+                                   "instances": self.initial_instance_settings}:
+            print("Settings saved:")
+            with open(resource_path('settings.json'), 'w') as f:
+                f.write(json.dumps(self.final_settings, indent=2))
 
         self.accept()
 
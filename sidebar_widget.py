@@ -21,61 +21,60 @@ class SidebarWidget(QFrame):
 
 
         self.instance_buttons = []  # Store instance buttons for later updates
-        for i in range(num_instances):
-            btn = QPushButton(f"💬{i + 1}")  # Added instance number to button text
-            btn.setObjectName("SidebarButton")
-            btn.setCheckable(True)  # Make instance buttons checkable
-            btn.clicked.connect(lambda _, index=i: self.on_instance_button_clicked(index))
-            self.sidebar_layout.addWidget(btn)
-            self.instance_buttons.append(btn)
 
         self.sidebar_layout.addSpacerItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding))
 
+        # The buttons' clicked signals are chained straight to the sidebar's signals, without a Python slot between them
         # New button for view mode toggle
         self.view_mode_button = QPushButton("↔️")  # Unicode for left-right arrow
         self.view_mode_button.setObjectName("SidebarButton")
         self.view_mode_button.setCheckable(True)  # Make it toggleable
-        self.view_mode_button.clicked.connect(self.view_mode_toggled.emit)
+        self.view_mode_button.clicked.connect(self.view_mode_toggled)
         self.sidebar_layout.addWidget(self.view_mode_button)
 
         self.edit_button = QPushButton("✏️")
         self.edit_button.setObjectName("SidebarButton")
-        self.edit_button.clicked.connect(self.edit_requested.emit)
+        self.edit_button.clicked.connect(self.edit_requested)
         self.sidebar_layout.addWidget(self.edit_button)
 
         self.settings_button = QPushButton("⚙️")
         self.settings_button.setObjectName("SidebarButton")
-        self.settings_button.clicked.connect(self.settings_requested.emit)
+        self.settings_button.clicked.connect(self.settings_requested)
         self.sidebar_layout.addWidget(self.settings_button)
 
         self.update_instance_buttons(num_instances)  # Call this to ensure initial state
 
     def update_instance_buttons(self, num_instances: int):
-        # Clear existing buttons
-        for btn in self.instance_buttons:
+        # Reuse the existing buttons and only create or delete the difference,
+        # with repaints suspended so the layout settles once.
+        self.setUpdatesEnabled(False)
+
+        # Remove buttons beyond the new instance count
+        for btn in self.instance_buttons[num_instances:]:
             self.sidebar_layout.removeWidget(btn)
             btn.deleteLater()
-        self.instance_buttons.clear()
+        del self.instance_buttons[num_instances:]
 
-        # Add new buttons based on num_instances
-        # This loop needs to insert buttons before the spacer.
-        # Find the index of the spacer item to insert before it.
-        spacer_index = self.sidebar_layout.count() - 3  # -3 for view_mode_button, edit_button, settings_button
-        if spacer_index < 0:  # In case there are no other buttons yet
-            spacer_index = 0
-
-        for i in range(num_instances):
+        # Add missing buttons right before view_mode_button, edit_button and settings_button
+        for i in range(len(self.instance_buttons), num_instances):
             btn = QPushButton(f"💬{i + 1}")
             btn.setObjectName("SidebarButton")
             btn.setCheckable(True)
-            btn.clicked.connect(lambda _, index=i: self.on_instance_button_clicked(index))
-            self.sidebar_layout.insertWidget(spacer_index + i, btn)  # Insert before spacer
+            btn.setProperty("instance_index", i)
+            btn.clicked.connect(self._on_instance_button_clicked)
+            self.sidebar_layout.insertWidget(self.sidebar_layout.count() - 3, btn)
             self.instance_buttons.append(btn)
 
         # Ensure only one instance button is checked at a time when view is stacked
-        if self.instance_buttons:
+        if self.instance_buttons and not any(btn.isChecked() for btn in self.instance_buttons):
             self.instance_buttons[0].setChecked(True)  # Select first instance by default
 
+        self.setUpdatesEnabled(True)
+
+    def _on_instance_button_clicked(self):
+        # One slot for every instance button, the clicked button carries its own index
+        self.on_instance_button_clicked(self.sender().property("instance_index"))
+
     def on_instance_button_clicked(self, index: int):
         # Uncheck all other instance buttons
         for i, btn in enumerate(self.instance_buttons):